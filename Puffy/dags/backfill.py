@@ -0,0 +1,256 @@
+"""
+Backfill Runner
+
+Reprocesses a date range one daily partition at a time:
+- DQ → transform runs per partition in parallel worker processes (bounded by --workers);
+  the BigQuery load runs serially in the parent, so concurrent transactions never
+  modify the same tables
+- Completed partitions are checkpointed, so a crashed run resumes where it stopped
+- Sessions are owned by the partition they start in: each partition reads the previous
+  day's last 30 minutes (to detect sessions continuing across midnight) and the next day
+  (to complete sessions that run past midnight), so session ids and boundaries match
+  what a single run over the whole range would produce
+- Purchases are owned by the partition they happen in; their buyers' events from the
+  previous LOOKBACK_DAYS days are read too, so attribution sees the full 7-day window
+- Loading stages the partition's events / attribution into the staging tables the SQL
+  templates read (analytics.enriched_events, analytics.attribution_results), then
+  rebuilds the partition from them
+
+Usage:
+    python backfill.py --start 2025-01-01 --end 2025-01-31 --workers 4
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from code.part1_validation import run_data_quality_validation, decode_event_data
+from code.part2_transformations import run_transformations
+from code.part2_transformations.attribution import LOOKBACK_DAYS
+from code.part2_transformations.incremental_load import LOAD_TEMPLATES, render_load_sql
+from code.part2_transformations.sessionization import SESSION_TIMEOUT_SECONDS
+
+BUCKET = "your-raw-events-bucket"
+EVENTS_PREFIX = "events/events_"  # events/events_20250223.csv
+DEFAULT_WORKERS = 4
+DEFAULT_CHECKPOINT = "reports/backfill_checkpoint.json"
+DEFAULT_OUTPUT_DIR = "reports/backfill"
+
+BQ_DATASET = "analytics"
+
+# staging table → (partition output, column renames, column owning the row's partition)
+STAGING_TABLES = {
+    "enriched_events": (
+        "fact_events",
+        {"device_type": "device", "utm_source": "source"},
+        "session_start",
+    ),
+    "attribution_results": (
+        "fact_attribution",
+        {"attribution_fc": "first_click_source", "attribution_lc": "last_click_source",
+         "purchase_timestamp": "timestamp"},
+        "timestamp",
+    ),
+}
+
+# Replaces the partition's rows in a staging table with the freshly loaded ones
+REPLACE_STAGED_SQL = """
+BEGIN TRANSACTION;
+DELETE FROM {dataset}.{table} WHERE DATE({owner}) = '{ds}';
+INSERT INTO {dataset}.{table} ({columns}) SELECT {columns} FROM {dataset}.{tmp};
+COMMIT TRANSACTION;
+DROP TABLE {dataset}.{tmp};
+"""
+
+
+def date_range(start, end):
+    day = date.fromisoformat(start)
+    while day <= date.fromisoformat(end):
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+# ------------------------------------------------------------
+# Checkpointing
+# ------------------------------------------------------------
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"done": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------
+# Partition stages
+# ------------------------------------------------------------
+def load_partition_events(ds):
+    from google.cloud import storage
+
+    client = storage.Client()
+    dfs = [
+        pd.read_csv(f"gs://{BUCKET}/{blob.name}")
+        for blob in client.list_blobs(BUCKET, prefix=f"{EVENTS_PREFIX}{ds.replace('-', '')}")
+        if blob.name.endswith(".csv")
+    ]
+    if not dfs:
+        return pd.DataFrame()
+
+    df = pd.concat(dfs, ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+def own_partition(outputs, ds):
+    """Keep only the rows this partition owns (sessions / purchases starting on ds)."""
+    day = pd.Timestamp(ds).date()
+
+    events = outputs["fact_events"]
+    events = events[events.session_start.dt.date == day]
+
+    funnel = outputs["fact_funnel"]
+    funnel = funnel[funnel.session_start.dt.date == day]
+
+    attribution = outputs["fact_attribution"]
+    if not attribution.empty:
+        attribution = attribution[attribution.purchase_timestamp.dt.date == day]
+
+    return {
+        "fact_events": events,
+        "fact_funnel": funnel,
+        "fact_attribution": attribution,
+        "dim_users": outputs["dim_users"][outputs["dim_users"].client_id.isin(events.client_id)],
+        "dim_devices": outputs["dim_devices"][outputs["dim_devices"].client_id.isin(events.client_id)],
+    }
+
+
+def write_partition(ds, outputs, output_dir):
+    for name, df in outputs.items():
+        path = os.path.join(output_dir, name, f"event_date={ds}")
+        os.makedirs(path, exist_ok=True)
+        df.to_parquet(os.path.join(path, "part.parquet"), index=False)
+
+
+def stage_partition(client, ds, output_dir):
+    from google.cloud import bigquery
+
+    for table, (output, renames, owner) in STAGING_TABLES.items():
+        df = pd.read_parquet(os.path.join(output_dir, output, f"event_date={ds}", "part.parquet"))
+        staged = client.get_table(f"{BQ_DATASET}.{table}")
+        columns = [f.name for f in staged.schema]
+        df = df.rename(columns=renames).reindex(columns=columns)
+
+        tmp = f"_backfill_{table}_{ds.replace('-', '')}"
+        job_config = bigquery.LoadJobConfig(schema=staged.schema, write_disposition="WRITE_TRUNCATE")
+        client.load_table_from_dataframe(df, f"{BQ_DATASET}.{tmp}", job_config=job_config).result()
+        client.query(REPLACE_STAGED_SQL.format(
+            dataset=BQ_DATASET, table=table, tmp=tmp, owner=owner, ds=ds, columns=", ".join(columns)
+        )).result()
+
+
+def load_partition(ds, output_dir):
+    from google.cloud import bigquery
+
+    # Stage this day's outputs, then rebuild exactly this day's partitions from them
+    client = bigquery.Client()
+    stage_partition(client, ds, output_dir)
+    for table in LOAD_TEMPLATES:
+        client.query(render_load_sql(table, ds, reprocess_days=0)).result()
+
+
+def load_context_events(ds, day):
+    """Events around ds needed to sessionize and attribute the partition exactly."""
+    day_start = pd.Timestamp(ds)
+    session_start = day_start - pd.Timedelta(seconds=SESSION_TIMEOUT_SECONDS)
+    buyers = day.loc[day.event_name == "purchase", "client_id"].unique()
+
+    history = []
+    for offset in range(LOOKBACK_DAYS, 0, -1):
+        prev = load_partition_events((day_start - timedelta(days=offset)).date().isoformat())
+        if not prev.empty:
+            history.append(prev[(prev.timestamp >= session_start) | prev.client_id.isin(buyers)])
+
+    nxt = load_partition_events((day_start + timedelta(days=1)).date().isoformat())
+    return pd.concat(history + [day, nxt], ignore_index=True)
+
+
+def run_partition(ds, output_dir):
+    day = load_partition_events(ds)
+    if day.empty:
+        return {"rows": 0, "dq_report": None}
+
+    decode_event_data(day)
+    print(f"[{ds}] Running data quality validation…")
+    # Per-partition report dir: parallel workers must not overwrite each other's reports
+    report_dir = os.path.join(output_dir, "dq_reports", f"event_date={ds}")
+    report = run_data_quality_validation(day.copy(), report_dir=report_dir)
+
+    print(f"[{ds}] Running transformations…")
+    outputs = own_partition(run_transformations(load_context_events(ds, day)), ds)
+    write_partition(ds, outputs, output_dir)
+
+    return {"rows": len(day), "dq_report": report}
+
+
+# ------------------------------------------------------------
+# MASTER RUNNER
+# ------------------------------------------------------------
+def run_backfill(start, end, workers=DEFAULT_WORKERS,
+                 checkpoint_path=DEFAULT_CHECKPOINT, output_dir=DEFAULT_OUTPUT_DIR):
+    state = load_checkpoint(checkpoint_path)
+    pending = [ds for ds in date_range(start, end) if ds not in state["done"]]
+    print(f"Backfill {start} → {end}: {len(pending)} partition(s) pending, "
+          f"{len(state['done'])} already done.")
+
+    failed = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_partition, ds, output_dir): ds for ds in pending}
+        for future in as_completed(futures):
+            ds = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed[ds] = str(e)
+                print(f"[{ds}] FAILED: {e}")
+                continue
+
+            if result["rows"]:
+                print(f"[{ds}] Loading partition…")
+                try:
+                    load_partition(ds, output_dir)
+                except Exception as e:
+                    failed[ds] = str(e)
+                    print(f"[{ds}] LOAD FAILED: {e}")
+                    continue
+
+            state["done"][ds] = {"finished_at": datetime.utcnow().isoformat(), **result}
+            save_checkpoint(checkpoint_path, state)
+            print(f"[{ds}] Done ({result['rows']} rows).")
+
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the e-commerce pipeline by date partition.")
+    parser.add_argument("--start", required=True, help="First partition (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, help="Last partition, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    args = parser.parse_args()
+
+    failed = run_backfill(args.start, args.end, args.workers, args.checkpoint, args.output_dir)
+    if failed:
+        raise SystemExit(f"{len(failed)} partition(s) failed: {sorted(failed)}")
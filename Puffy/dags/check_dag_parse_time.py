@@ -0,0 +1,74 @@
+"""
+DAG parse-time budget check, run in CI (.github/workflows/dag-parse-time.yml)
+and before syncing the DAG folder.
+
+Parses ecommerce_full_pipeline_dag.py in a fresh interpreter, the way the
+scheduler does, and fails when:
+- parsing takes longer than the budget (airflow itself is imported first and
+  not counted: the scheduler pays for it once per process, not per parse), or
+- parsing imported a pipeline package, which must be deferred to task execution.
+
+Usage:
+    python check_dag_parse_time.py [--budget 2.0]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DAG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ecommerce_full_pipeline_dag.py")
+DEFAULT_BUDGET_SECONDS = float(os.environ.get("DAG_PARSE_BUDGET_SECONDS", 2.0))
+
+DEFERRED_MODULES = (
+    "code.part1_validation",
+    "code.part2_transformations",
+    "code.part3_analysis",
+    "code.part4_monitoring",
+)
+
+PROBE = """
+import importlib.util, json, sys, time
+import airflow
+
+spec = importlib.util.spec_from_file_location("dag_under_test", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+start = time.perf_counter()
+spec.loader.exec_module(module)
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_dag_parse(dag_file=DAG_FILE):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, dag_file],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(dag_file),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_dag_parse(dag_file=DAG_FILE, budget=DEFAULT_BUDGET_SECONDS):
+    result = measure_dag_parse(dag_file)
+    failures = []
+
+    if result["seconds"] > budget:
+        failures.append(f"DAG parse took {result['seconds']:.2f}s (budget {budget:.2f}s).")
+
+    eager = [m for m in result["modules"] if m.startswith(DEFERRED_MODULES)]
+    if eager:
+        failures.append(f"Pipeline modules imported at parse time: {eager}")
+
+    return result["seconds"], failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if the DAG file is too slow to parse.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS)
+    args = parser.parse_args()
+
+    seconds, failures = check_dag_parse(budget=args.budget)
+    if failures:
+        raise SystemExit("\n".join(failures))
+    print(f"DAG parse OK ({seconds:.2f}s, budget {args.budget:.2f}s).")
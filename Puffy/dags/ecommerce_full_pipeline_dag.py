@@ -6,24 +6,22 @@ Includes:
 - Part 2: Transformations (Sessionization, Funnel Modeling, Attribution)
 - Part 3: Business Analysis
 - Part 4: Production Monitoring
+
+The scheduler re-parses this file continuously, so parsing must stay cheap:
+pandas and the pipeline packages are imported inside the task callables, and
+the SQL files are referenced by name and rendered from template_searchpath
+at execution time.
 """
 
 from airflow import DAG
 from airflow.providers.google.cloud.operators.bigquery import BigQueryInsertJobOperator
-from airflow.providers.google.cloud.operators.dataflow import DataflowTemplatedJobStartOperator
 from airflow.providers.google.cloud.operators.gcs import GCSListObjectsOperator
 from airflow.operators.python import PythonOperator
 
 from datetime import datetime, timedelta
-import pandas as pd
 import json
 import os
-
-# Import your Python modules
-from code.part1_validation import run_data_quality_validation
-from code.part2_transformations import run_transformations
-from code.part3_analysis import run_business_analysis
-from code.part4_monitoring.monitoring_engine import run_monitoring
+import tempfile
 
 
 # ==============================
@@ -38,12 +36,18 @@ default_args = {
     "retry_delay": timedelta(minutes=10),
 }
 
+# Days of already-loaded partitions rebuilt on every run to absorb late-arriving events.
+# Override per run with: airflow dags trigger -c '{"reprocess_days": 7}'
+REPROCESS_DAYS = int(os.environ.get("PIPELINE_REPROCESS_DAYS", 3))
+
 dag = DAG(
     dag_id="ecommerce_full_pipeline",
     default_args=default_args,
     schedule_interval="0 3 * * *",  # Runs daily at 3 AM
     start_date=datetime(2025, 1, 1),
     catchup=False,
+    params={"reprocess_days": REPROCESS_DAYS},
+    template_searchpath=["/home/airflow/gcs/data/sql"],
 )
 
 # ==============================
@@ -60,6 +64,8 @@ list_gcs_files = GCSListObjectsOperator(
 # TASK 2 — LOAD RAW EVENTS INTO XCOM
 # ==============================
 def load_events_callable(**context):
+    import pandas as pd
+
     bucket = "your-raw-events-bucket"
     files = context["ti"].xcom_pull(task_ids="list_gcs_event_files")
 
@@ -80,12 +86,26 @@ load_raw_events = PythonOperator(
 # ==============================
 # TASK 3 — PART 1 VALIDATION
 # ==============================
+# Columnar copies of the task outputs, read lazily (projected columns only) by monitoring
+DATA_DIR = "/home/airflow/gcs/data/pipeline"
+
+def write_parquet(df, name, ds):
+    path = os.path.join(DATA_DIR, name, f"{ds}.parquet")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path, index=False)
+    return path
+
 def validation_callable(**context):
+    import pandas as pd
+    from code.part1_validation import run_data_quality_validation, decode_event_data
+
     raw_json = context["ti"].xcom_pull("raw_df")
     df = pd.read_json(raw_json)
 
+    # Parse event_data once; validation and revenue KPIs reuse the typed columns
+    decode_event_data(df)
     report = run_data_quality_validation(df)
-    context["ti"].xcom_push("validated_df", df.to_json())
+    context["ti"].xcom_push("validated_path", write_parquet(df, "validated", context["ds"]))
     context["ti"].xcom_push("dq_report", json.dumps(report))
 
 validate_events = PythonOperator(
@@ -97,15 +117,28 @@ validate_events = PythonOperator(
 # ==============================
 # TASK 4 — PART 2 TRANSFORMATION (SESSION, FUNNEL, ATTRIBUTION)
 # ==============================
+# Persisted dim_users / dim_devices, upserted with each day's events
+DIM_DIR = "/home/airflow/gcs/data/dims"
+
 def transformations_callable(**context):
-    raw_json = context["ti"].xcom_pull("raw_df")
-    df = pd.read_json(raw_json)
+    import pandas as pd
+    from code.part2_transformations import run_transformations
 
-    session_df, funnel_df, attribution_df = run_transformations(df)
+    # Validated events, with event_data already decoded (amount feeds order_value)
+    df = pd.read_parquet(context["ti"].xcom_pull(task_ids="validate_events", key="validated_path"))
+
+    # The client-indexed event store is memory-mapped, so it lives on the worker's
+    # local disk (not the GCS mount) and is removed when the task ends
+    with tempfile.TemporaryDirectory(prefix="event_store_") as store_dir:
+        outputs = run_transformations(df, dim_dir=DIM_DIR, store_dir=store_dir)
+    session_df = outputs["fact_events"]
+    funnel_df = outputs["fact_funnel"]
+    attribution_df = outputs["fact_attribution"]
 
     context["ti"].xcom_push("session_df", session_df.to_json())
     context["ti"].xcom_push("funnel_df", funnel_df.to_json())
     context["ti"].xcom_push("attribution_df", attribution_df.to_json())
+    context["ti"].xcom_push("attribution_path", write_parquet(attribution_df, "attribution", context["ds"]))
 
 transform_data = PythonOperator(
     task_id="transform_data",
@@ -116,6 +149,10 @@ transform_data = PythonOperator(
 # ==============================
 # TASK 5 — LOAD TO BIGQUERY USING SQL FILES
 # ==============================
+# Incremental loads: each SQL file is a Jinja template that rebuilds only the
+# event_date partitions in [ds - params.reprocess_days, ds] of a table
+# partitioned by event_date and clustered on client_id / session_id. Files are
+# referenced by name and rendered from template_searchpath at execution time.
 
 BQ_PROJECT = "your-gcp-project"
 BQ_DATASET = "analytics"
@@ -124,7 +161,7 @@ load_sessions_sql = BigQueryInsertJobOperator(
     task_id="load_sessions",
     configuration={
         "query": {
-            "query": open("/home/airflow/gcs/data/sql/create_sessions.sql").read(),
+            "query": "create_sessions.sql",
             "useLegacySql": False,
         }
     },
@@ -135,7 +172,7 @@ load_funnel_sql = BigQueryInsertJobOperator(
     task_id="load_funnel",
     configuration={
         "query": {
-            "query": open("/home/airflow/gcs/data/sql/create_funnel.sql").read(),
+            "query": "create_funnel.sql",
             "useLegacySql": False,
         }
     },
@@ -146,7 +183,7 @@ load_attribution_sql = BigQueryInsertJobOperator(
     task_id="load_attribution",
     configuration={
         "query": {
-            "query": open("/home/airflow/gcs/data/sql/create_attribution.sql").read(),
+            "query": "create_attribution.sql",
             "useLegacySql": False,
         }
     },
@@ -157,6 +194,9 @@ load_attribution_sql = BigQueryInsertJobOperator(
 # TASK 6 — PART 3 BUSINESS ANALYSIS
 # ==============================
 def analysis_callable(**context):
+    import pandas as pd
+    from code.part3_analysis import run_business_analysis
+
     session = pd.read_json(context["ti"].xcom_pull("session_df"))
     funnel = pd.read_json(context["ti"].xcom_pull("funnel_df"))
     attr = pd.read_json(context["ti"].xcom_pull("attribution_df"))
@@ -173,20 +213,35 @@ run_analysis = PythonOperator(
 # ==============================
 # TASK 7 — PART 4 MONITORING
 # ==============================
+SKETCH_DIR = os.path.join(DATA_DIR, "sketches")
+
 def monitoring_callable(**context):
-    raw = pd.read_json(context["ti"].xcom_pull("raw_df"))
-    session = pd.read_json(context["ti"].xcom_pull("session_df"))
-    funnel = pd.read_json(context["ti"].xcom_pull("funnel_df"))
-    attr = pd.read_json(context["ti"].xcom_pull("attribution_df"))
+    from code.part4_monitoring.monitoring_engine import run_monitoring
+    from code.part4_monitoring.lazy_frames import LazyFrame
+
+    # Lazy handles: monitors load only the columns they declare, for this run's date
+    ti, ds = context["ti"], context["ds"]
+    raw = LazyFrame(
+        ti.xcom_pull(task_ids="validate_events", key="validated_path"),
+        date_column="timestamp", date=ds,
+    )
+    attr = LazyFrame(
+        ti.xcom_pull(task_ids="transform_data", key="attribution_path"),
+        date_column="purchase_timestamp", date=ds,
+    )
 
     env = {
         "gcs_bucket": "your-raw-events-bucket",
         "email_sender": "alerts@example.com",
         "email_receiver": "ops@example.com",
-        "email_password": "APP_PASSWORD_OR_TOKEN"
+        "email_password": "APP_PASSWORD_OR_TOKEN",
+        # Per-day Bloom filters / count-min sketches, keyed on the run date and
+        # merged across the lookback days
+        "sketch_dir": SKETCH_DIR,
+        "run_date": ds,
     }
 
-    alerts = run_monitoring(raw, funnel, attr, env)
+    alerts = run_monitoring(raw, None, attr, env)
     print(alerts)
 
 production_monitoring = PythonOperator(
@@ -2,49 +2,32 @@
 Design Principles:
 1. Fail-Fast: Bad data must NEVER silently enter the warehouse.
 2. Layered Validation: Schema → Validity → Consistency → Anomaly.
-3. Reusable & Extensible: New rules can be added without touching the core engine.
+3. Reusable & Extensible: New rules are declared with @rule in rules/*.py (see rule_registry)
+   and picked up by the planner without touching the core engine.
 4. Business-Aware: Validation includes metrics that directly affect revenue attribution.
 5. Deterministic Logging: Every failed row is quarantined; nothing is discarded silently.
 """
 
 import pandas as pd
 import os
-from rules.schema_checks import run_schema_checks
-from rules.validity_checks import run_validity_checks
-from rules.consistency_checks import run_consistency_checks
-from rules.anomaly_checks import run_anomaly_checks
+from rule_registry import compile_plan, run_plan
 
-INVALID_ROWS = []
-RESULTS = []
+# Importing the rule modules registers their rules (layer order: schema → validity → consistency → anomaly)
+import rules.schema_checks
+import rules.validity_checks
+import rules.consistency_checks
+import rules.anomaly_checks
 
-def log_result(check_name, status, detail=""):
-    RESULTS.append({
-        "check": check_name,
-        "status": "PASS" if status else "FAIL",
-        "detail": detail
-    })
+def run_all(input_df, report_dir="reports"):
+    plan = compile_plan(input_df.columns, suite="dq")
+    print(f"Running {len(plan.steps)} checks ({len(plan.skipped)} skipped: inputs absent)…")
+    results, quarantined = run_plan(plan, input_df)
 
-def quarantine(row, reason):
-    row["_dq_failure_reason"] = reason
-    INVALID_ROWS.append(row)
+    os.makedirs(report_dir, exist_ok=True)
+    pd.DataFrame(results).to_csv(os.path.join(report_dir, "validation_results.csv"), index=False)
 
-def run_all(input_df):
-    print("Running Schema Checks…")
-    run_schema_checks(input_df, log_result, quarantine)
-
-    print("Running Validity Checks…")
-    run_validity_checks(input_df, log_result, quarantine)
-
-    print("Running Consistency Checks…")
-    run_consistency_checks(input_df, log_result, quarantine)
-
-    print("Running Anomaly Checks…")
-    run_anomaly_checks(input_df, log_result)
-
-    os.makedirs("reports", exist_ok=True)
-    pd.DataFrame(RESULTS).to_csv("reports/validation_results.csv", index=False)
-
-    if INVALID_ROWS:
-        pd.DataFrame(INVALID_ROWS).to_csv("reports/quarantined_rows.csv", index=False)
+    if quarantined:
+        pd.concat(quarantined).to_csv(os.path.join(report_dir, "quarantined_rows.csv"), index=False)
 
     print("Data Quality Framework Execution Complete.")
+    return results
@@ -0,0 +1,76 @@
+"""
+event_data decoding
+
+Parses the event_data JSON column once, in batches, and materializes the hot
+fields used downstream as typed columns:
+- event_data_valid → bool, False when the payload is not valid JSON
+- amount           → Float64 (order revenue)
+- product_id       → string
+- quantity         → Int64
+
+Validity checks and revenue KPIs read these columns instead of re-parsing.
+Uses orjson when installed, falling back to the stdlib json module.
+"""
+
+import pandas as pd
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+BATCH_SIZE = 50_000
+
+# column → keys looked up (in order) in the event_data object
+HOT_FIELDS = {
+    "amount": ("revenue", "amount", "value"),
+    "product_id": ("product_id", "item_id"),
+    "quantity": ("quantity",),
+}
+
+_INVALID = object()
+
+
+def parse_event_data(raw):
+    """Decode one payload; returns _INVALID when it is not valid JSON."""
+    if not isinstance(raw, (str, bytes)):
+        return _INVALID
+    try:
+        return _loads(raw)
+    except ValueError:
+        return _INVALID
+
+
+def _extract(obj, keys):
+    if not isinstance(obj, dict):
+        return None
+    for k in keys:
+        if obj.get(k) is not None:
+            return obj[k]
+    return None
+
+
+def decode_event_data(df, batch_size=BATCH_SIZE):
+    valid = []
+    hot = {col: [] for col in HOT_FIELDS}
+
+    values = df["event_data"].tolist()
+    for start in range(0, len(values), batch_size):
+        parsed = [parse_event_data(raw) for raw in values[start:start + batch_size]]
+        valid.extend(obj is not _INVALID for obj in parsed)
+        for col, keys in HOT_FIELDS.items():
+            hot[col].extend(_extract(obj, keys) for obj in parsed)
+
+    df["event_data_valid"] = pd.Series(valid, index=df.index, dtype=bool)
+    df["amount"] = pd.to_numeric(
+        pd.Series(hot["amount"], index=df.index, dtype=object), errors="coerce"
+    ).astype("Float64")
+    df["product_id"] = pd.Series(
+        [None if v is None else str(v) for v in hot["product_id"]], index=df.index, dtype="string"
+    )
+    quantity = pd.to_numeric(pd.Series(hot["quantity"], index=df.index, dtype=object), errors="coerce")
+    df["quantity"] = quantity.where(quantity == quantity.round()).astype("Int64")
+
+    return df
@@ -0,0 +1,208 @@
+"""
+Rule Registry & Planner
+
+Rules are declared with decorators instead of being wired into run_all by hand:
+
+    @rule("validity.client_id_present", requires=["client_id"], reason="client_id_missing")
+    def client_id_present(df, ctx):
+        return df["client_id"].isna()          # row mask of failing rows
+
+    @derived(["date"], requires=["timestamp"])
+    def event_date(df):
+        df["date"] = df["timestamp"].dt.date   # shared derived column
+
+A rule returns either a boolean row mask (failing rows, quarantined under `reason`)
+or an (ok, detail) tuple for dataset-level checks. It declares the columns it
+reads (`requires`, raw or derived) and the rules that must pass first (`after`).
+Columns of a secondary input frame are named "<frame>.<column>" (e.g.
+"attribution.attribution_lc"); the frame itself is passed to the rule in ctx[<frame>].
+
+compile_plan() turns the registered rules of a suite into an ordered plan for a
+given set of columns: dependencies first, rules whose inputs are absent skipped
+up front, and each derived column computed once, just before the first rule
+that runs and needs it.
+run_plan() executes it and reports status + cost (seconds) per rule.
+Used by the Part 1 framework (suite "dq") and the Part 4 runtime monitors (suite "monitor").
+"""
+
+import time
+
+import pandas as pd
+
+# Event taxonomy shared by the Part 1 validity rules and the Part 4 monitors
+ALLOWED_EVENTS = {
+    "page_viewed", "email_filled_on_popup",
+    "product_added_to_cart", "checkout_started",
+    "purchase"
+}
+
+RULES = {}
+DERIVED = {}
+
+
+class Rule:
+    def __init__(self, name, fn, suite, requires, after, reason, detail):
+        self.name = name
+        self.fn = fn
+        self.suite = suite
+        self.requires = list(requires)
+        self.after = list(after)
+        self.reason = reason
+        self.detail = detail
+
+
+class Derived:
+    def __init__(self, columns, fn, requires):
+        self.name = f"derive.{fn.__name__}"
+        self.columns = list(columns)
+        self.fn = fn
+        self.requires = list(requires)
+
+
+def rule(name, requires=(), after=(), suite="dq", reason=None, detail="{failed_rows} failing rows"):
+    def register(fn):
+        RULES[name] = Rule(name, fn, suite, requires, after, reason, detail)
+        return fn
+    return register
+
+
+def derived(columns, requires=()):
+    def register(fn):
+        d = Derived(columns, fn, requires)
+        for col in d.columns:
+            DERIVED[col] = d
+        return fn
+    return register
+
+
+def required_columns(suite, frame=None):
+    """Raw columns a suite reads from the main frame, or from a secondary `frame`
+    (derived columns expanded to their inputs)."""
+    cols = set()
+    pending = [c for r in RULES.values() if r.suite == suite for c in r.requires]
+    while pending:
+        col = pending.pop()
+        if col in DERIVED:
+            pending.extend(DERIVED[col].requires)
+            continue
+        prefix, _, name = col.rpartition(".")
+        if (prefix or None) == frame:
+            cols.add(name)
+    return sorted(cols)
+
+
+def frame_columns(frame, columns):
+    """Planner names of a secondary frame's columns ("<frame>.<column>")."""
+    return [f"{frame}.{c}" for c in columns]
+
+
+# ------------------------------------------------------------
+# Planner
+# ------------------------------------------------------------
+class Plan:
+    def __init__(self, steps, skipped):
+        self.steps = steps        # (Rule, [Derived needed first]) in execution order
+        self.skipped = skipped    # (Rule, detail) pairs not runnable on these columns
+
+
+def _resolve(columns, available, derives):
+    """Missing columns after planning derivations for `columns` (appended to `derives`)."""
+    missing = []
+    for col in columns:
+        if col in available:
+            continue
+        d = DERIVED.get(col)
+        if d is None or _resolve(d.requires, available, derives):
+            missing.append(col)
+            continue
+        if d not in derives:
+            derives.append(d)
+        available.update(d.columns)
+    return missing
+
+
+def _ordered(suite):
+    # Registration order, with every rule placed after the rules it depends on
+    ordered, seen = [], set()
+
+    def visit(r):
+        if r.name in seen:
+            return
+        seen.add(r.name)
+        for dep in r.after:
+            if dep in RULES:
+                visit(RULES[dep])
+        ordered.append(r)
+
+    for r in list(RULES.values()):
+        if r.suite == suite:
+            visit(r)
+    return ordered
+
+
+def compile_plan(columns, suite="dq"):
+    available = set(columns)
+    planned = set()
+    steps, skipped = [], []
+
+    for r in _ordered(suite):
+        derives = []
+        missing = _resolve(r.requires, set(available), derives)
+        blocked = [dep for dep in r.after if dep in RULES and dep not in planned]
+        if missing or blocked:
+            why = f"missing columns: {missing}" if missing else f"depends on skipped: {blocked}"
+            skipped.append((r, why))
+            continue
+
+        steps.append((r, derives))
+        planned.add(r.name)
+
+    return Plan(steps, skipped)
+
+
+# ------------------------------------------------------------
+# Executor
+# ------------------------------------------------------------
+def run_plan(plan, df, ctx=None):
+    """Returns (results, quarantined frames). Results carry status and cost per rule."""
+    ctx = ctx or {}
+    results, quarantined, failed = [], [], set()
+
+    for r, why in plan.skipped:
+        results.append({"check": r.name, "status": "SKIPPED", "detail": why, "seconds": 0.0})
+
+    for step, derives in plan.steps:
+        if any(dep in failed for dep in step.after):
+            results.append({"check": step.name, "status": "SKIPPED",
+                            "detail": f"dependency failed: {[d for d in step.after if d in failed]}",
+                            "seconds": 0.0})
+            failed.add(step.name)
+            continue
+
+        for d in derives:
+            # Computed once per run; columns materialized upstream are not recomputed
+            if all(c in df.columns for c in d.columns):
+                continue
+            start = time.perf_counter()
+            d.fn(df)
+            results.append({"check": d.name, "status": "DERIVED", "detail": "",
+                            "seconds": time.perf_counter() - start})
+
+        start = time.perf_counter()
+        out = step.fn(df, ctx)
+        if isinstance(out, pd.Series):
+            mask = out.fillna(False).astype(bool)
+            failed_rows = int(mask.sum())
+            ok = failed_rows == 0
+            detail = "" if ok else step.detail.format(failed_rows=failed_rows)
+            if not ok and step.reason:
+                quarantined.append(df[mask].assign(_dq_failure_reason=step.reason))
+        else:
+            ok, detail = out
+
+        if not ok:
+            failed.add(step.name)
+        results.append({"check": step.name, "status": "PASS" if ok else "FAIL", "detail": detail,
+                        "seconds": time.perf_counter() - start})
+
+    return results, quarantined
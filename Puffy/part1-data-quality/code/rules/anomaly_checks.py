@@ -1,8 +1,12 @@
 import pandas as pd
+from rule_registry import rule, derived
 
-def run_anomaly_checks(df, log):
-
+@derived(["date"], requires=["timestamp"])
+def event_date(df):
     df["date"] = df["timestamp"].dt.date
+
+@rule("anomaly.event_volume_outlier", requires=["date"], after=["schema.timestamp_type"])
+def event_volume_outlier(df, ctx):
     daily_counts = df.groupby("date").size().reset_index(name="count")
     daily_counts["rolling_mean"] = daily_counts["count"].rolling(7).mean()
     daily_counts["rolling_std"] = daily_counts["count"].rolling(7).std()
@@ -12,5 +16,4 @@ def run_anomaly_checks(df, log):
         (daily_counts["count"] < daily_counts["rolling_mean"] - 3*daily_counts["rolling_std"])
     ]
 
-    log("anomaly.event_volume_outlier", anomalies.empty,
-        detail=f"Detected anomalies: {len(anomalies)}")
+    return anomalies.empty, f"Detected anomalies: {len(anomalies)}"
@@ -1,26 +1,21 @@
 import pandas as pd
+from rule_registry import rule
 
-def run_consistency_checks(df, log, quarantine):
+# 1. Timestamp monotonicity (per client): every event of an out-of-order client is quarantined
+@rule("consistency.event_sequence_monotonic", requires=["client_id", "timestamp"],
+      after=["schema.timestamp_type"], reason="timestamp_out_of_order")
+def event_sequence_monotonic(df, ctx):
+    out_of_order = df.groupby("client_id")["timestamp"].diff() < pd.Timedelta(0)
+    return df["client_id"].isin(df.loc[out_of_order, "client_id"])
 
-    # 1. Timestamp monotonicity (per client)
-    inconsistent = []
-    for cid, grp in df.groupby("client_id"):
-        if not grp["timestamp"].is_monotonic_increasing:
-            inconsistent.append(cid)
-            for _, row in grp.sort_values("timestamp").iterrows():
-                quarantine(row, "timestamp_out_of_order")
-    log("consistency.event_sequence_monotonic", len(inconsistent)==0)
+# 2. Page URLs that do NOT match event_name expectations
+@rule("consistency.semantic_event_url_alignment", requires=["event_name", "page_url"],
+      reason="event-url-semantic-mismatch")
+def semantic_event_url_alignment(df, ctx):
+    return (df.event_name=="product_added_to_cart") & (~df.page_url.str.contains("/product", na=False))
 
-    # 2. Page URLs that do NOT match event_name expectations
-    mismatches = df[
-        (df.event_name=="product_added_to_cart") & (~df.page_url.str.contains("/product"))
-    ]
-    for _, row in mismatches.iterrows():
-        quarantine(row, "event-url-semantic-mismatch")
-    log("consistency.semantic_event_url_alignment", mismatches.empty)
-
-    # 3. Duplicated events (same client, same timestamp, same event_name)
-    dupes = df[df.duplicated(subset=["client_id","timestamp","event_name"], keep=False)]
-    for _, row in dupes.iterrows():
-        quarantine(row, "duplicate_event")
-    log("consistency.duplicate_events", dupes.empty)
+# 3. Duplicated events (same client, same timestamp, same event_name)
+@rule("consistency.duplicate_events", requires=["client_id", "timestamp", "event_name"],
+      reason="duplicate_event")
+def duplicate_events(df, ctx):
+    return df.duplicated(subset=["client_id","timestamp","event_name"], keep=False)
@@ -1,20 +1,20 @@
 import pandas as pd
+from rule_registry import rule
 
 REQUIRED_COLUMNS = [
     "client_id", "page_url", "referrer", "timestamp",
     "event_name", "event_data", "user_agent"
 ]
 
-def run_schema_checks(df, log, quarantine):
-    # Column completeness
+# Column completeness
+@rule("schema.required_columns")
+def required_columns(df, ctx):
     missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
-    if missing:
-        log("schema.required_columns", False, f"Missing: {missing}")
-    else:
-        log("schema.required_columns", True)
+    return not missing, f"Missing: {missing}" if missing else ""
 
-    # Data types
+# Data types
+@rule("schema.timestamp_type", requires=["timestamp"])
+def timestamp_type(df, ctx):
     if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
-        log("schema.timestamp_type", False, "timestamp must be ISO8601/UTC")
-    else:
-        log("schema.timestamp_type", True)
+        return False, "timestamp must be ISO8601/UTC"
+    return True, ""
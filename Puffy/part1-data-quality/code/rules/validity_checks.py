@@ -1,48 +1,41 @@
-import json
 import pandas as pd
 import urllib.parse as urlparse
+from event_data import decode_event_data
+from rule_registry import rule, derived, ALLOWED_EVENTS
 
-def run_validity_checks(df, log, quarantine):
+# Decoded once, shared with downstream revenue KPIs (skipped if decoded upstream)
+@derived(["event_data_valid", "amount", "product_id", "quantity"], requires=["event_data"])
+def decoded_event_data(df):
+    decode_event_data(df)
 
-    # 1. Client ID validity
-    invalid = df[df["client_id"].isna()]
-    for _, row in invalid.iterrows():
-        quarantine(row, "client_id_missing")
-    log("validity.client_id_present", invalid.empty)
+# 1. Client ID validity
+@rule("validity.client_id_present", requires=["client_id"], reason="client_id_missing")
+def client_id_present(df, ctx):
+    return df["client_id"].isna()
 
-    # 2. Timestamp validity
-    invalid_ts = df[df["timestamp"].isna()]
-    for _, row in invalid_ts.iterrows():
-        quarantine(row, "timestamp_missing")
-    log("validity.timestamp_present", invalid_ts.empty)
+# 2. Timestamp validity
+@rule("validity.timestamp_present", requires=["timestamp"], reason="timestamp_missing")
+def timestamp_present(df, ctx):
+    return df["timestamp"].isna()
 
-    # 3. Event name validity
-    allowed = {
-        "page_viewed","email_filled_on_popup",
-        "product_added_to_cart","checkout_started",
-        "purchase"
-    }
-    invalid_event = df[~df.event_name.isin(allowed)]
-    for _, r in invalid_event.iterrows():
-        quarantine(r, "invalid_event_name")
-    log("validity.event_name_valid", invalid_event.empty)
+# 3. Event name validity
+@rule("validity.event_name_valid", requires=["event_name"], reason="invalid_event_name")
+def event_name_valid(df, ctx):
+    return ~df.event_name.isin(ALLOWED_EVENTS)
 
-    # 4. JSON validity in event_data
-    bad_json = []
-    for i, row in df.iterrows():
-        try:
-            json.loads(row["event_data"])
-        except:
-            bad_json.append(row)
-            quarantine(row, "malformed_event_data_json")
-    log("validity.event_data_is_valid_json", len(bad_json)==0)
+# 4. JSON validity in event_data
+@rule("validity.event_data_is_valid_json", requires=["event_data_valid"], reason="malformed_event_data_json")
+def event_data_is_valid_json(df, ctx):
+    return ~df["event_data_valid"]
 
-    # 5. URL parse validity
-    bad_url = []
-    for i, row in df.iterrows():
-        try:
-            urlparse.urlparse(row["page_url"])
-        except:
-            bad_url.append(row)
-            quarantine(row, "invalid_page_url")
-    log("validity.page_url_parseable", len(bad_url)==0)
+# 5. URL parse validity
+def _parseable(url):
+    try:
+        urlparse.urlparse(url)
+        return True
+    except Exception:
+        return False
+
+@rule("validity.page_url_parseable", requires=["page_url"], reason="invalid_page_url")
+def page_url_parseable(df, ctx):
+    return ~df["page_url"].map(_parseable).astype(bool)
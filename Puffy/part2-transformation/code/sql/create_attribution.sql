@@ -1,9 +1,41 @@
-CREATE OR REPLACE TABLE analytics.attribution AS
+-- Incremental, partition-aware load of analytics.attribution.
+-- Only the partitions inside the reprocessing window are rebuilt, so late
+-- arriving purchases for the previous {{ params.reprocess_days }} day(s) are picked up.
+{% set window_start = macros.ds_add(ds, -params.reprocess_days) -%}
+{% set window_end = macros.ds_add(ds, 1) -%}
+
+CREATE TABLE IF NOT EXISTS analytics.attribution (
+  purchase_id STRING,
+  client_id STRING,
+  order_value FLOAT64,
+  first_click_source STRING,
+  last_click_source STRING,
+  purchase_ts TIMESTAMP,
+  event_date DATE
+)
+{%- if params.partitioned | default(true) %}
+PARTITION BY event_date
+CLUSTER BY client_id
+{%- endif %};
+
+BEGIN TRANSACTION;
+
+DELETE FROM analytics.attribution
+WHERE event_date >= '{{ window_start }}' AND event_date < '{{ window_end }}';
+
+INSERT INTO analytics.attribution (
+  purchase_id, client_id, order_value, first_click_source,
+  last_click_source, purchase_ts, event_date
+)
 SELECT
   purchase_id,
   client_id,
   order_value,
   first_click_source,
   last_click_source,
-  TIMESTAMP(timestamp) AS purchase_ts
-FROM analytics.attribution_results;
+  TIMESTAMP(timestamp) AS purchase_ts,
+  DATE(timestamp) AS event_date
+FROM analytics.attribution_results
+WHERE timestamp >= '{{ window_start }}' AND timestamp < '{{ window_end }}';
+
+COMMIT TRANSACTION;
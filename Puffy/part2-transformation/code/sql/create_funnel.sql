@@ -1,8 +1,49 @@
-CREATE OR REPLACE TABLE analytics.funnel AS
+-- Incremental, partition-aware load of analytics.funnel.
+-- Every session with an event inside the reprocessing window is rebuilt, so late
+-- arriving events for the previous {{ params.reprocess_days }} day(s) are picked up.
+-- Sessions crossing the window edges are rebuilt whole from one extra day of
+-- events on either side and replace their row by session_id (see create_sessions.sql).
+{% set window_start = macros.ds_add(ds, -params.reprocess_days) -%}
+{% set window_end = macros.ds_add(ds, 1) -%}
+{% set lookback_start = macros.ds_add(ds, -params.reprocess_days - 1) -%}
+{% set lookahead_end = macros.ds_add(ds, 2) -%}
+
+CREATE TABLE IF NOT EXISTS analytics.funnel (
+  session_id STRING,
+  client_id STRING,
+  add_ts TIMESTAMP,
+  checkout_ts TIMESTAMP,
+  purchase_ts TIMESTAMP,
+  event_date DATE
+)
+{%- if params.partitioned | default(true) %}
+PARTITION BY event_date
+CLUSTER BY client_id, session_id
+{%- endif %};
+
+BEGIN TRANSACTION;
+
+DELETE FROM analytics.funnel
+WHERE (event_date >= '{{ window_start }}' AND event_date < '{{ window_end }}')
+   OR (event_date >= '{{ lookback_start }}' AND session_id IN (
+         SELECT session_id FROM analytics.enriched_events
+         WHERE timestamp >= '{{ window_start }}' AND timestamp < '{{ window_end }}'));
+
+INSERT INTO analytics.funnel (
+  session_id, client_id, add_ts, checkout_ts, purchase_ts, event_date
+)
 SELECT
   session_id,
+  client_id,
   MAX(CASE WHEN event_name = 'product_added_to_cart' THEN timestamp END) AS add_ts,
   MAX(CASE WHEN event_name = 'checkout_started' THEN timestamp END) AS checkout_ts,
-  MAX(CASE WHEN event_name = 'purchase' THEN timestamp END) AS purchase_ts
+  MAX(CASE WHEN event_name = 'purchase' THEN timestamp END) AS purchase_ts,
+  DATE(MIN(timestamp)) AS event_date
 FROM analytics.enriched_events
-GROUP BY session_id;
+WHERE timestamp >= '{{ lookback_start }}' AND timestamp < '{{ lookahead_end }}'
+  AND session_id IN (
+    SELECT session_id FROM analytics.enriched_events
+    WHERE timestamp >= '{{ window_start }}' AND timestamp < '{{ window_end }}')
+GROUP BY session_id, client_id;
+
+COMMIT TRANSACTION;
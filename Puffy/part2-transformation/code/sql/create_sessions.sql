@@ -1,4 +1,44 @@
-CREATE OR REPLACE TABLE analytics.sessions AS
+-- Incremental, partition-aware load of analytics.sessions.
+-- Every session with an event inside the reprocessing window is rebuilt, so late
+-- arriving events for the previous {{ params.reprocess_days }} day(s) are picked up.
+-- Sessions are aggregated from one extra day of events on either side and keyed on
+-- session_id: a session that started before the window and continues into it is
+-- rebuilt whole in the partition it started in, instead of being loaded twice.
+{% set window_start = macros.ds_add(ds, -params.reprocess_days) -%}
+{% set window_end = macros.ds_add(ds, 1) -%}
+{% set lookback_start = macros.ds_add(ds, -params.reprocess_days - 1) -%}
+{% set lookahead_end = macros.ds_add(ds, 2) -%}
+
+CREATE TABLE IF NOT EXISTS analytics.sessions (
+  session_id STRING,
+  client_id STRING,
+  session_start TIMESTAMP,
+  session_end TIMESTAMP,
+  pageviews INT64,
+  add_to_cart_count INT64,
+  checkout_count INT64,
+  purchase_count INT64,
+  device_type STRING,
+  source STRING,
+  event_date DATE
+)
+{%- if params.partitioned | default(true) %}
+PARTITION BY event_date
+CLUSTER BY client_id, session_id
+{%- endif %};
+
+BEGIN TRANSACTION;
+
+DELETE FROM analytics.sessions
+WHERE (event_date >= '{{ window_start }}' AND event_date < '{{ window_end }}')
+   OR (event_date >= '{{ lookback_start }}' AND session_id IN (
+         SELECT session_id FROM analytics.enriched_events
+         WHERE timestamp >= '{{ window_start }}' AND timestamp < '{{ window_end }}'));
+
+INSERT INTO analytics.sessions (
+  session_id, client_id, session_start, session_end, pageviews,
+  add_to_cart_count, checkout_count, purchase_count, device_type, source, event_date
+)
 SELECT
   session_id,
   client_id,
@@ -10,6 +50,12 @@ SELECT
   COUNTIF(event_name = 'purchase') AS purchase_count,
   ANY_VALUE(device) AS device_type,
   ANY_VALUE(source) AS source,
-  DATE(session_start) AS event_date
+  DATE(MIN(timestamp)) AS event_date
 FROM analytics.enriched_events
+WHERE timestamp >= '{{ lookback_start }}' AND timestamp < '{{ lookahead_end }}'
+  AND session_id IN (
+    SELECT session_id FROM analytics.enriched_events
+    WHERE timestamp >= '{{ window_start }}' AND timestamp < '{{ window_end }}')
 GROUP BY session_id, client_id;
+
+COMMIT TRANSACTION;
@@ -0,0 +1,68 @@
+-- One-time migration to the incremental, partition-aware loads.
+-- The tables built by the earlier CREATE OR REPLACE loads are unpartitioned, and
+-- analytics.funnel / analytics.attribution lack the columns the templates insert,
+-- so CREATE TABLE IF NOT EXISTS in create_*.sql leaves them unusable. This script
+-- recreates each table partitioned by event_date and clustered like the templates,
+-- from its current contents. BigQuery cannot change a table's partitioning in
+-- place, so each table is copied, dropped and renamed.
+--
+-- Run once, before the first incremental load:
+--     bq query --use_legacy_sql=false < migrate_partitioned_tables.sql
+
+-- sessions (migrated first: funnel takes client_id / event_date from it)
+CREATE TABLE analytics.sessions_partitioned
+PARTITION BY event_date
+CLUSTER BY client_id, session_id
+AS
+SELECT
+  session_id,
+  client_id,
+  session_start,
+  session_end,
+  pageviews,
+  add_to_cart_count,
+  checkout_count,
+  purchase_count,
+  device_type,
+  source,
+  DATE(session_start) AS event_date
+FROM analytics.sessions;
+
+DROP TABLE analytics.sessions;
+ALTER TABLE analytics.sessions_partitioned RENAME TO sessions;
+
+-- funnel
+CREATE TABLE analytics.funnel_partitioned
+PARTITION BY event_date
+CLUSTER BY client_id, session_id
+AS
+SELECT
+  f.session_id,
+  s.client_id,
+  f.add_ts,
+  f.checkout_ts,
+  f.purchase_ts,
+  s.event_date
+FROM analytics.funnel AS f
+LEFT JOIN analytics.sessions AS s USING (session_id);
+
+DROP TABLE analytics.funnel;
+ALTER TABLE analytics.funnel_partitioned RENAME TO funnel;
+
+-- attribution
+CREATE TABLE analytics.attribution_partitioned
+PARTITION BY event_date
+CLUSTER BY client_id
+AS
+SELECT
+  purchase_id,
+  client_id,
+  order_value,
+  first_click_source,
+  last_click_source,
+  purchase_ts,
+  DATE(purchase_ts) AS event_date
+FROM analytics.attribution;
+
+DROP TABLE analytics.attribution;
+ALTER TABLE analytics.attribution_partitioned RENAME TO attribution;
@@ -3,26 +3,35 @@ Attribution Framework
 Supports:
 - First-click attribution (FC)
 - Last-click attribution (LC)
-- 7-day lookback window
+- 7-day lookback window (LOOKBACK_DAYS)
+- Optional EventStore for O(log n) per-client history lookups
 """
 
 import pandas as pd
+from sessionization import extract_utm
 
-def build_attribution(df):
+LOOKBACK_DAYS = 7
 
-    # Filter only events with UTM or purchase
-    purchases = df[df["event_name"]=="purchase"]
+def build_attribution(df, store=None):
+
+    # Filter only events with UTM or purchase (a purchase without client_id has no history)
+    purchases = df[(df["event_name"]=="purchase") & df["client_id"].notna()]
     attributions = []
 
     for _, purchase in purchases.iterrows():
         cid = purchase["client_id"]
         purchase_time = purchase["timestamp"]
 
-        history = df[
-            (df.client_id==cid) &
-            (df.timestamp <= purchase_time) &
-            (df.timestamp >= purchase_time - pd.Timedelta(days=7))
-        ].sort_values("timestamp")
+        if store is not None:
+            # The store holds the ingested events; UTMs are parsed for this slice only
+            history = store.client_events(cid, purchase_time - pd.Timedelta(days=LOOKBACK_DAYS), purchase_time)
+            history["utm_source"] = history["page_url"].map(lambda url: extract_utm(url)["utm_source"])
+        else:
+            history = df[
+                df.client_id.eq(cid).fillna(False) &
+                (df.timestamp <= purchase_time) &
+                (df.timestamp >= purchase_time - pd.Timedelta(days=LOOKBACK_DAYS))
+            ].sort_values("timestamp")
 
         # Only events with UTMs considered marketing touches
         touches = history[history["utm_source"].notna()]
@@ -31,7 +40,9 @@ def build_attribution(df):
             # fallback to referrer
             channel = "direct" if pd.isna(purchase["referrer"]) else "referral"
             attributions.append({
+                "purchase_id": purchase.get("event_id"),
                 "client_id": cid,
+                "order_value": purchase.get("amount"),
                 "purchase_timestamp": purchase_time,
                 "attribution_fc": channel,
                 "attribution_lc": channel
@@ -44,7 +55,9 @@ def build_attribution(df):
         lc = touches.iloc[-1]["utm_source"]
 
         attributions.append({
+            "purchase_id": purchase.get("event_id"),
             "client_id": cid,
+            "order_value": purchase.get("amount"),
             "purchase_timestamp": purchase_time,
             "attribution_fc": fc,
             "attribution_lc": lc
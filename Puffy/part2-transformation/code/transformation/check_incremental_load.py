@@ -0,0 +1,88 @@
+"""
+Offline check of the incremental load templates (run in CI).
+
+Renders ../sql/create_*.sql and executes them on sqlite (run_load_locally)
+against fixture staging rows, and fails when:
+- a rerun of the same day changes the loaded tables (loads must be idempotent), or
+- a session crossing midnight is not loaded exactly once, whole, in the
+  partition it started in, whichever order the days are loaded in.
+
+Usage:
+    python check_incremental_load.py
+"""
+
+from incremental_load import connect_local, run_load_locally
+
+ENRICHED_EVENTS = [
+    # session_id, client_id, timestamp, event_name, device, source
+    ("c1-20250107235000000000-e1", "c1", "2025-01-07 23:50:00", "page_viewed", "mobile", "google"),
+    ("c1-20250107235000000000-e1", "c1", "2025-01-08 00:10:00", "purchase", "mobile", "google"),
+    ("c2-20250108100000000000-e3", "c2", "2025-01-08 10:00:00", "page_viewed", "desktop", None),
+    ("c2-20250108100000000000-e3", "c2", "2025-01-08 10:05:00", "product_added_to_cart", "desktop", None),
+]
+
+ATTRIBUTION_RESULTS = [
+    # purchase_id, client_id, order_value, first_click_source, last_click_source, timestamp
+    ("e2", "c1", 42.0, "google", "google", "2025-01-08 00:10:00"),
+]
+
+EXPECTED_SESSIONS = [
+    # session_id, event_date, pageviews, add_to_cart_count, purchase_count
+    ("c1-20250107235000000000-e1", "2025-01-07", 1, 0, 1),
+    ("c2-20250108100000000000-e3", "2025-01-08", 1, 1, 0),
+]
+
+
+def load_fixture():
+    conn = connect_local()
+    conn.execute("CREATE TABLE analytics.enriched_events "
+                 "(session_id, client_id, timestamp, event_name, device, source)")
+    conn.execute("CREATE TABLE analytics.attribution_results "
+                 "(purchase_id, client_id, order_value, first_click_source, last_click_source, timestamp)")
+    conn.executemany("INSERT INTO analytics.enriched_events VALUES (?, ?, ?, ?, ?, ?)", ENRICHED_EVENTS)
+    conn.executemany("INSERT INTO analytics.attribution_results VALUES (?, ?, ?, ?, ?, ?)", ATTRIBUTION_RESULTS)
+    return conn
+
+
+def snapshot(conn):
+    return {
+        "sessions": conn.execute(
+            "SELECT session_id, event_date, pageviews, add_to_cart_count, purchase_count "
+            "FROM analytics.sessions ORDER BY session_id").fetchall(),
+        "funnel": conn.execute(
+            "SELECT session_id, event_date, purchase_ts FROM analytics.funnel ORDER BY session_id").fetchall(),
+        "attribution": conn.execute(
+            "SELECT purchase_id, event_date FROM analytics.attribution ORDER BY purchase_id").fetchall(),
+    }
+
+
+def check_incremental_load():
+    failures = []
+
+    for days in (["2025-01-07", "2025-01-08"], ["2025-01-08", "2025-01-07"]):
+        conn = load_fixture()
+        for ds in days:
+            for table in ("sessions", "funnel", "attribution"):
+                run_load_locally(conn, table, ds, reprocess_days=0)
+        loaded = snapshot(conn)
+
+        if loaded["sessions"] != EXPECTED_SESSIONS:
+            failures.append(f"Loading {days}: sessions {loaded['sessions']} != {EXPECTED_SESSIONS}")
+        if [r[0] for r in loaded["funnel"]] != [r[0] for r in EXPECTED_SESSIONS]:
+            failures.append(f"Loading {days}: funnel rows {loaded['funnel']}")
+        if loaded["attribution"] != [("e2", "2025-01-08")]:
+            failures.append(f"Loading {days}: attribution rows {loaded['attribution']}")
+
+        for table in ("sessions", "funnel", "attribution"):
+            run_load_locally(conn, table, days[-1])
+        if snapshot(conn) != loaded:
+            failures.append(f"Rerunning {days[-1]} with the default window changed the loaded tables.")
+
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_incremental_load()
+    if failures:
+        raise SystemExit("\n".join(failures))
+    print("Incremental load templates OK.")
@@ -0,0 +1,124 @@
+"""
+Dimensional Tables (incremental)
+- dim_users   → client_id, first_seen, last_seen, updated_at
+- dim_devices → client_id, device_type, device_first_seen, updated_at
+  (device of the client's earliest event, chosen by timestamp — not row order)
+
+Dims are persisted as parquet and upserted (SCD type 1, keyed by client_id)
+with the day's events only: first_seen/last_seen by a min/max merge, and the
+device replaced only when the day holds an earlier event (late data).
+DimensionIndex keeps them indexed by client_id so later stages join dims
+without rescanning events.
+"""
+
+import os
+
+import pandas as pd
+
+DIM_USERS_FILE = "dim_users.parquet"
+DIM_DEVICES_FILE = "dim_devices.parquet"
+
+
+def normalize_client_ids(ids):
+    """client_id as the `string` dtype with NA kept as NA (never "nan").
+
+    A null makes pandas read integer ids as float; integral floats are turned back
+    into integers first so 123 and 123.0 map to the same "123" key on every day.
+    """
+    if pd.api.types.is_float_dtype(ids) and (ids.dropna() % 1 == 0).all():
+        ids = ids.astype("Int64")
+    return ids.astype("string")
+
+
+def upsert_dim_users(dim_users, events, updated_at=None):
+    updated_at = updated_at or pd.Timestamp.utcnow()
+    day = (
+        events.groupby("client_id")
+        .agg(first_seen=("timestamp", "min"), last_seen=("timestamp", "max"))
+    )
+    day["updated_at"] = updated_at
+
+    if dim_users is None or dim_users.empty:
+        return day.reset_index()
+
+    existing = dim_users.set_index("client_id")
+    current = existing.reindex(day.index)
+    day["first_seen"] = day.first_seen.where(
+        current.first_seen.isna() | (day.first_seen < current.first_seen), current.first_seen
+    )
+    day["last_seen"] = day.last_seen.where(
+        current.last_seen.isna() | (day.last_seen > current.last_seen), current.last_seen
+    )
+    return day.combine_first(existing).reset_index()
+
+
+def upsert_dim_devices(dim_devices, events, updated_at=None):
+    updated_at = updated_at or pd.Timestamp.utcnow()
+    day = (
+        events.sort_values(["client_id", "timestamp"], kind="mergesort")
+        .drop_duplicates("client_id")
+        .set_index("client_id")[["device_type", "timestamp"]]
+        .rename(columns={"timestamp": "device_first_seen"})
+    )
+    day["updated_at"] = updated_at
+
+    if dim_devices is None or dim_devices.empty:
+        return day.reset_index()
+
+    existing = dim_devices.set_index("client_id")
+    current = existing.reindex(day.index)
+    day = day[current.device_first_seen.isna() | (day.device_first_seen < current.device_first_seen)]
+    return day.combine_first(existing).reset_index()
+
+
+# ------------------------------------------------------------
+# Persistence
+# ------------------------------------------------------------
+def load_dims(dim_dir):
+    def read(name):
+        path = os.path.join(dim_dir, name)
+        if not os.path.exists(path):
+            return None
+        dim = pd.read_parquet(path)
+        return dim.assign(client_id=normalize_client_ids(dim["client_id"]))
+
+    return read(DIM_USERS_FILE), read(DIM_DEVICES_FILE)
+
+
+def save_dims(dim_dir, dim_users, dim_devices):
+    os.makedirs(dim_dir, exist_ok=True)
+    for name, df in ((DIM_USERS_FILE, dim_users), (DIM_DEVICES_FILE, dim_devices)):
+        tmp = os.path.join(dim_dir, f".{name}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(dim_dir, name))
+
+
+def update_dims(events, dim_dir=None):
+    """Upsert the day's events into the persisted dims (or build them from scratch)."""
+    dim_users, dim_devices = load_dims(dim_dir) if dim_dir else (None, None)
+    updated_at = pd.Timestamp.utcnow()
+
+    dim_users = upsert_dim_users(dim_users, events, updated_at)
+    dim_devices = upsert_dim_devices(dim_devices, events, updated_at)
+
+    if dim_dir:
+        save_dims(dim_dir, dim_users, dim_devices)
+    return dim_users, dim_devices
+
+
+# ------------------------------------------------------------
+# In-memory lookup
+# ------------------------------------------------------------
+class DimensionIndex:
+    def __init__(self, dim_users, dim_devices):
+        self.users = dim_users.set_index("client_id")
+        self.devices = dim_devices.set_index("client_id")
+
+    def lookup(self, client_ids, column):
+        dim = self.users if column in self.users.columns else self.devices
+        return dim[column].reindex(client_ids).to_numpy()
+
+    def join(self, df, columns):
+        for column in columns:
+            df[column] = self.lookup(df["client_id"], column)
+        return df
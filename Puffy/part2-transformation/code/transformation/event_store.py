@@ -0,0 +1,75 @@
+"""
+Event Store
+Sorted, memory-mapped copy of the day's events for client-level random access.
+
+Layout (one directory per build):
+- events.arrow → Arrow IPC (Feather v2, uncompressed) sorted by (client_id, timestamp),
+                 written in fixed-size record batches so it can be memory-mapped
+- index.npz    → sorted unique client_ids + row offsets [start, stop) per client
+
+EventStore.client_events(cid, t0, t1) binary-searches the client index and then the
+client's timestamps, and materializes only that slice — O(log n) instead of a
+boolean mask over the full frame. client_id is stored as string; events without
+a client_id are kept (sorted last) but not indexed.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+EVENTS_FILE = "events.arrow"
+INDEX_FILE = "index.npz"
+ROW_GROUP_SIZE = 64_000
+
+
+def build_event_store(df, store_dir, row_group_size=ROW_GROUP_SIZE):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    df = df.assign(client_id=df["client_id"].astype("string"))
+    df = df.sort_values(["client_id", "timestamp"], kind="mergesort", na_position="last")
+    df = df.reset_index(drop=True)
+
+    # Null client_ids sort last, so offsets over the non-null prefix index the full table
+    ids = df["client_id"].dropna()
+    client_ids, starts, counts = np.unique(ids.to_numpy(dtype=str), return_index=True, return_counts=True)
+
+    os.makedirs(store_dir, exist_ok=True)
+    feather.write_feather(
+        pa.Table.from_pandas(df, preserve_index=False),
+        os.path.join(store_dir, EVENTS_FILE),
+        compression="uncompressed",
+        chunksize=row_group_size,
+    )
+    np.savez(os.path.join(store_dir, INDEX_FILE), client_ids=client_ids, starts=starts, stops=starts + counts)
+    return EventStore(store_dir)
+
+
+class EventStore:
+    def __init__(self, store_dir):
+        import pyarrow as pa
+
+        self.table = pa.ipc.open_file(pa.memory_map(os.path.join(store_dir, EVENTS_FILE))).read_all()
+        with np.load(os.path.join(store_dir, INDEX_FILE)) as index:
+            self.client_ids = index["client_ids"]
+            self.starts = index["starts"]
+            self.stops = index["stops"]
+
+    def client_range(self, client_id):
+        """Row range [start, stop) of a client, or (0, 0) if unknown."""
+        client_id = str(client_id)
+        i = np.searchsorted(self.client_ids, client_id)
+        if i == len(self.client_ids) or self.client_ids[i] != client_id:
+            return 0, 0
+        return int(self.starts[i]), int(self.stops[i])
+
+    def client_events(self, client_id, t0=None, t1=None):
+        """Events of one client with t0 <= timestamp <= t1, in timestamp order."""
+        start, stop = self.client_range(client_id)
+        if t0 is not None or t1 is not None:
+            ts = self.table.column("timestamp").slice(start, stop - start).to_numpy()
+            lo = np.searchsorted(ts, pd.Timestamp(t0).to_datetime64(), "left") if t0 is not None else 0
+            hi = np.searchsorted(ts, pd.Timestamp(t1).to_datetime64(), "right") if t1 is not None else len(ts)
+            start, stop = start + lo, start + hi
+        return self.table.slice(start, max(stop - start, 0)).to_pandas()
@@ -11,6 +11,8 @@ Rules (from README + industry standard):
 import pandas as pd
 from urllib.parse import urlparse, parse_qs
 
+SESSION_TIMEOUT_SECONDS = 1800
+
 def extract_utm(url):
     try:
         parsed = urlparse(url)
@@ -25,7 +27,8 @@ def extract_utm(url):
 
 
 def build_sessions(df):
-    df = df.sort_values(["client_id", "timestamp"])
+    # event_id breaks timestamp ties, so every run / partition orders events the same way
+    df = df.sort_values(["client_id", "timestamp", "event_id"], kind="mergesort")
 
     # Extract UTM for attribution
     utm_cols = df["page_url"].apply(extract_utm).apply(pd.Series)
@@ -48,12 +51,21 @@ def build_sessions(df):
 
     # Session break conditions:
     df["new_session"] = (
-        (df["time_diff"] > 1800) |
+        (df["time_diff"] > SESSION_TIMEOUT_SECONDS) |
         (df["utm_changed"] & df["utm_source"].notna()) |
         (df["device_changed"])
     )
 
-    # Assign session_id incrementally
-    df["session_id"] = df.groupby("client_id")["new_session"].cumsum()
+    # Assign sessions incrementally, then key them by client + session start (to the
+    # microsecond) + first event_id so the same session gets the same id whichever
+    # run / date partition produces it, and sessions starting together stay distinct
+    df["session_seq"] = df.groupby("client_id")["new_session"].cumsum()
+    sessions = df.groupby(["client_id", "session_seq"])
+    df["session_start"] = sessions["timestamp"].transform("min")
+    df["session_id"] = (
+        df["client_id"].astype(str) + "-"
+        + df["session_start"].dt.strftime("%Y%m%d%H%M%S%f") + "-"
+        + sessions["event_id"].transform("first").astype(str)
+    )
 
     return df
@@ -1,37 +1,45 @@
 """
 Main Transformation Engine:
-1. Sessionization
-2. Funnel Construction
-3. Attribution Modeling
-4. Dimensional Tables
+1. Event Store (sorted, client-indexed copy of the ingested events when store_dir is given)
+2. Sessionization
+3. Funnel Construction
+4. Attribution Modeling
+5. Dimensional Tables (incrementally upserted when dim_dir is given)
+
+client_id is normalized once, up front (string, NA kept as NA), so the store,
+sessions and persisted dims share the same keys. The event store is built from
+the ingested events and serves attribution's per-client lookback.
 """
 
 import pandas as pd
 from sessionization import build_sessions
 from funnel_builder import build_funnel
 from attribution import build_attribution
+from dimensions import update_dims, DimensionIndex, normalize_client_ids
+from event_store import build_event_store
+
+def run_transformations(raw_df, dim_dir=None, store_dir=None):
+    raw_df = raw_df.assign(client_id=normalize_client_ids(raw_df["client_id"]))
+
+    store = None
+    if store_dir:
+        print("▶ Building client-indexed event store...")
+        store = build_event_store(raw_df, store_dir)
 
-def run_transformations(raw_df):
     print("▶ Building sessions...")
     sessionized = build_sessions(raw_df)
 
+    print("▶ Updating dimensions (users & devices)...")
+    dim_users, dim_devices = update_dims(sessionized, dim_dir)
+    dims = DimensionIndex(dim_users, dim_devices)
+
     print("▶ Building funnel metrics...")
-    funnel = build_funnel(sessionized)
+    funnel = dims.join(build_funnel(sessionized), ["first_seen", "device_type"])
 
     print("▶ Building first-click & last-click attribution...")
-    attribution = build_attribution(sessionized)
-
-    print("▶ Building dimensions (users & devices)...")
-    dim_users = (
-        sessionized.groupby("client_id")
-        .agg(first_seen=("timestamp","min"), last_seen=("timestamp","max"))
-        .reset_index()
-    )
-
-    dim_devices = (
-        sessionized.groupby(["client_id"])
-        .device_type.first().reset_index()
-    )
+    attribution = build_attribution(sessionized, store)
+    if not attribution.empty:
+        attribution = dims.join(attribution, ["first_seen", "device_type"])
 
     return {
         "fact_events": sessionized,
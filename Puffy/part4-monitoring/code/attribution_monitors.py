@@ -1,9 +1,23 @@
 """
 Monitor attribution stability and marketing signal integrity.
+
+The attribution.* rules below run in the "monitor" suite (see rule_registry),
+with the attribution output as the "attribution" frame.
 """
 
+import os
+from datetime import timedelta
+
 import pandas as pd
 
+from .sketches import HyperLogLog, CountMinSketch
+from rule_registry import rule
+
+CHANNEL_LOOKBACK_DAYS = 7
+# Below this many purchase events the distinct-client comparison is exact: the HLL
+# tolerance would hide real gaps in a set this small
+APPROX_MIN_PURCHASES = 100_000
+
 def detect_direct_spike(attr):
     daily = (
         attr.assign(is_direct=attr.attribution_lc=="direct")
@@ -28,3 +42,55 @@ def detect_paid_drop(attr):
 def detect_attr_missing_for_purchases(events, attr):
     purchase_events = events[events.event_name=="purchase"]
     return purchase_events.client_id.nunique() != attr.client_id.nunique()
+
+
+def detect_attr_missing_for_purchases_approx(events, attr, p=14):
+    # HyperLogLog estimates: flag only differences beyond 3 standard errors
+    purchasers = HyperLogLog(p).add(events.client_id[events.event_name=="purchase"])
+    attributed = HyperLogLog(p).add(attr.client_id)
+    expected, actual = purchasers.count(), attributed.count()
+    return abs(expected - actual) > 3 * purchasers.relative_error * max(expected, actual, 1)
+
+
+def top_channels(attr, sketch_dir=None, run_date=None, n=5, lookback_days=CHANNEL_LOOKBACK_DAYS):
+    # Count-min over last-click channels: one sketch per run date (rebuilt on reruns),
+    # and the previous days' sketches merged into a baseline
+    today = CountMinSketch().add(attr.attribution_lc)
+    baseline = CountMinSketch()
+    if sketch_dir and run_date:
+        day = pd.Timestamp(run_date).date()
+        today.save(os.path.join(sketch_dir, f"channels_{day}.npz"))
+        for offset in range(1, lookback_days + 1):
+            path = os.path.join(sketch_dir, f"channels_{day - timedelta(days=offset)}.npz")
+            if os.path.exists(path):
+                baseline.merge(CountMinSketch.load(path))
+    return today.top(n), baseline.top(n)
+
+
+def detect_top_channel_shift(attr, sketch_dir, run_date, n=5):
+    today, baseline = top_channels(attr, sketch_dir, run_date, n)
+    if not today or not baseline:
+        return None
+    top = today[0][0]
+    return None if top in dict(baseline) else top
+
+
+# ------------------------------------------------------------
+# Monitor rules (suite "monitor")
+# ------------------------------------------------------------
+@rule("attribution.coverage", suite="monitor",
+      requires=["event_name", "client_id", "attribution.client_id"])
+def attribution_coverage(df, ctx):
+    if ctx.get("sketch_dir") and (df.event_name == "purchase").sum() >= APPROX_MIN_PURCHASES:
+        missing = detect_attr_missing_for_purchases_approx(df, ctx["attribution"])
+    else:
+        missing = detect_attr_missing_for_purchases(df, ctx["attribution"])
+    return not missing, "Purchasing clients and attributed clients differ — purchases missing attribution."
+
+
+@rule("attribution.top_channel_shift", suite="monitor", requires=["attribution.attribution_lc"])
+def top_channel_shift(df, ctx):
+    if not (ctx.get("sketch_dir") and ctx.get("run_date")):
+        return True, "No sketch_dir / run_date: channel baseline not kept."
+    shifted = detect_top_channel_shift(ctx["attribution"], ctx["sketch_dir"], ctx["run_date"])
+    return shifted is None, f"Top last-click channel '{shifted}' is outside the {CHANNEL_LOOKBACK_DAYS}-day top channels."
@@ -1,37 +1,44 @@
 """
 business_kpi_monitors.py
 Monitors real KPIs: Revenue, Conversion Rate, AOV, Add-to-Cart Rate, Attribution shifts.
+
+Registered as rules of the "monitor" suite (see rule_registry); events are the
+main frame (with the decoded event_data columns, e.g. amount) and the
+attribution output is the "attribution" frame.
 """
 
 import numpy as np
 import pandas as pd
 
-def run_business_kpi_monitors(funnel_df, attribution_df):
-    alerts = []
-
-    # -----------------------------
-    # Revenue Drop Check
-    # -----------------------------
-    revenue = funnel_df[funnel_df.event_name == "purchase"].amount.sum()
-    if revenue < 0.8 * funnel_df.amount.mean() * 7:
-        alerts.append("Possible revenue drop: <80% of weekly average.")
-
-    # -----------------------------
-    # Conversion Rate Drop
-    # -----------------------------
-    views = funnel_df[funnel_df.event_name == "page_viewed"].shape[0]
-    purchases = funnel_df[funnel_df.event_name == "purchase"].shape[0]
+from rule_registry import rule
+
+# -----------------------------
+# Revenue Drop Check
+# -----------------------------
+@rule("kpi.revenue_drop", suite="monitor", requires=["event_name", "amount"])
+def revenue_drop(df, ctx):
+    revenue = df[df.event_name == "purchase"].amount.sum()
+    mean_amount = df.amount.mean()  # NA on a day without any amount
+    ok = not (pd.notna(mean_amount) and revenue < 0.8 * mean_amount * 7)
+    return ok, "Possible revenue drop: <80% of weekly average."
+
+# -----------------------------
+# Conversion Rate Drop
+# -----------------------------
+@rule("kpi.conversion_rate", suite="monitor", requires=["event_name"])
+def conversion_rate(df, ctx):
+    views = df[df.event_name == "page_viewed"].shape[0]
+    purchases = df[df.event_name == "purchase"].shape[0]
     conv = purchases / max(views, 1)
 
-    if conv < 0.005:  # 0.5%
-        alerts.append(f"Conversion rate abnormally low ({conv:.3%}).")
-
-    # -----------------------------
-    # Attribution Spike Detection
-    # -----------------------------
-    by_channel = attribution_df["attributed_channel"].value_counts(normalize=True)
+    return conv >= 0.005, f"Conversion rate abnormally low ({conv:.3%})."  # 0.5%
 
-    if by_channel.max() > 0.70:
-        alerts.append("One channel is receiving >70% attribution — possible tracking skew.")
+# -----------------------------
+# Attribution Spike Detection
+# -----------------------------
+@rule("kpi.attribution_skew", suite="monitor", requires=["attribution.attribution_lc"])
+def attribution_skew(df, ctx):
+    by_channel = ctx["attribution"]["attribution_lc"].value_counts(normalize=True)
 
-    return alerts
+    ok = by_channel.empty or by_channel.max() <= 0.70
+    return ok, "One channel is receiving >70% attribution — possible tracking skew."
@@ -0,0 +1,99 @@
+"""
+Offline check of run_monitoring on lazily loaded parquet inputs (run in CI).
+
+Writes validated events and attribution the way the DAG does — tz-aware (UTC)
+timestamps, a null-timestamp row, and a column-less attribution file for a day
+without purchases — and runs run_monitoring on LazyFrame handles. Fails when
+monitoring raises, or when the null-timestamp row is no longer reported.
+Operational checks and e-mail are replaced by no-ops: they need GCP / SMTP.
+
+Usage:
+    python check_lazy_monitoring.py
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# rule_registry is imported top-level, as by the Part 1 rules
+sys.path.insert(0, os.path.join(HERE, "..", "..", "part1-data-quality", "code"))
+
+RUN_DATE = "2025-01-08"
+
+
+def import_monitoring():
+    # This directory is a package (relative imports); load it under its own name
+    package = types.ModuleType("part4_monitoring")
+    package.__path__ = [HERE]
+    sys.modules["part4_monitoring"] = package
+    engine = importlib.import_module("part4_monitoring.monitoring_engine")
+    lazy_frames = importlib.import_module("part4_monitoring.lazy_frames")
+
+    engine.run_pipeline_operational_checks = lambda env: {}
+    engine.send_email_alert = lambda subject, messages, env: None
+    return engine.run_monitoring, lazy_frames.LazyFrame
+
+
+def write_inputs(data_dir, with_purchases=True):
+    events = pd.DataFrame({
+        "event_id": ["e1", "e2", "e3", "e4"],
+        "client_id": ["c1", "c1", "c2", "c3"],
+        "timestamp": pd.to_datetime(
+            ["2025-01-08T09:00:00Z", "2025-01-08T09:05:00Z", None, "2025-01-07T23:00:00Z"], utc=True
+        ),
+        "event_name": ["page_viewed", "purchase" if with_purchases else "page_viewed",
+                       "page_viewed", "page_viewed"],
+        "page_url": ["https://x/?utm_source=google", "https://x/", "https://x/", "https://x/"],
+        "amount": pd.array([None, 25.0 if with_purchases else None, None, None], dtype="Float64"),
+    })
+    if with_purchases:
+        attribution = pd.DataFrame({
+            "client_id": ["c1"],
+            "purchase_timestamp": pd.to_datetime(["2025-01-08T09:05:00Z"], utc=True),
+            "attribution_fc": ["google"],
+            "attribution_lc": ["google"],
+        })
+    else:
+        attribution = pd.DataFrame()
+
+    validated_path = os.path.join(data_dir, "validated.parquet")
+    attribution_path = os.path.join(data_dir, "attribution.parquet")
+    events.to_parquet(validated_path, index=False)
+    attribution.to_parquet(attribution_path, index=False)
+    return validated_path, attribution_path
+
+
+def check_lazy_monitoring():
+    run_monitoring, LazyFrame = import_monitoring()
+    failures = []
+
+    for with_purchases in (True, False):
+        with tempfile.TemporaryDirectory() as data_dir:
+            validated_path, attribution_path = write_inputs(data_dir, with_purchases)
+            raw = LazyFrame(validated_path, date_column="timestamp", date=RUN_DATE)
+            attr = LazyFrame(attribution_path, date_column="purchase_timestamp", date=RUN_DATE)
+            env = {"sketch_dir": os.path.join(data_dir, "sketches"), "run_date": RUN_DATE}
+
+            case = "with purchases" if with_purchases else "without purchases"
+            try:
+                alerts = run_monitoring(raw, None, attr, env)
+            except Exception as e:
+                failures.append(f"run_monitoring {case} raised {type(e).__name__}: {e}")
+                continue
+
+            if not any("Missing timestamps: 1 rows." in a for a in alerts):
+                failures.append(f"Null-timestamp row not reported {case}: {alerts}")
+
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_lazy_monitoring()
+    if failures:
+        raise SystemExit("\n".join(failures))
+    print("Lazy monitoring inputs OK.")
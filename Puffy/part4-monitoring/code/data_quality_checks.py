@@ -1,31 +1,78 @@
 """
 data_quality_checks.py
 Runtime data quality monitors for production.
+
+Monitors are registered in the Part 1 rule registry (suite "monitor"), imported
+under the same top-level name as the Part 1 rules so both share one registry.
 """
 
+import os
+import urllib.parse as urlparse
+from datetime import timedelta
+
 import pandas as pd
 
-def run_data_quality_monitors(df):
-    alerts = []
+from .sketches import BloomFilter
+from rule_registry import rule, derived, ALLOWED_EVENTS
+
+DUPLICATE_LOOKBACK_DAYS = 7
+UTM_MISSING_THRESHOLD = 100
+
+
+def count_duplicate_event_ids(df, sketch_dir, run_date, lookback_days=DUPLICATE_LOOKBACK_DAYS):
+    # Constant memory via one Bloom filter per run date; the day's filter is rebuilt on
+    # reruns, and event_ids replayed from the previous days are counted as duplicates
+    day = pd.Timestamp(run_date).date()
+    seen_today = BloomFilter()
+    dup = seen_today.add_new(df.event_id)
+
+    for offset in range(1, lookback_days + 1):
+        path = os.path.join(sketch_dir, f"event_ids_{day - timedelta(days=offset)}.npz")
+        if os.path.exists(path):
+            dup |= BloomFilter.load(path).contains(df.event_id)
+
+    seen_today.save(os.path.join(sketch_dir, f"event_ids_{day}.npz"))
+    return int(dup.sum())
+
+
+# ------------------------------------------------------------
+# Monitor rules (suite "monitor"); a FAIL detail is the alert text
+# ------------------------------------------------------------
+
+# Missing timestamp anomalies
+@rule("monitor.timestamp_present", suite="monitor", requires=["timestamp"],
+      detail="Missing timestamps: {failed_rows} rows.")
+def timestamp_present(df, ctx):
+    return df.timestamp.isna()
 
-    # Missing timestamp anomalies
-    if df.timestamp.isna().sum() > 0:
-        alerts.append(f"Missing timestamps: {df.timestamp.isna().sum()} rows.")
+# Unexpected event names
+@rule("monitor.event_name_known", suite="monitor", requires=["event_name"])
+def event_name_known(df, ctx):
+    unknowns = df[~df.event_name.isin(ALLOWED_EVENTS)]["event_name"].unique()
+    return len(unknowns) == 0, f"Unknown event types detected: {unknowns.tolist()}"
 
-    # Unexpected event names
-    allowed = {"page_viewed", "product_added_to_cart", "checkout_started", "purchase"}
-    unknowns = df[~df.event_name.isin(allowed)]["event_name"].unique()
-    if len(unknowns) > 0:
-        alerts.append(f"Unknown event types detected: {unknowns.tolist()}")
+# High duplicate user events
+@rule("monitor.event_id_unique", suite="monitor", requires=["event_id"])
+def event_id_unique(df, ctx):
+    if ctx.get("sketch_dir") and ctx.get("run_date"):
+        dup_count = count_duplicate_event_ids(df, ctx["sketch_dir"], ctx["run_date"])
+    else:
+        dup_count = int(df.duplicated(subset=["event_id"]).sum())
+    return dup_count == 0, f"Duplicate event_ids detected: {dup_count}"
 
-    # High duplicate user events
-    dup_count = df.duplicated(subset=["event_id"]).sum()
-    if dup_count > 0:
-        alerts.append(f"Duplicate event_ids detected: {dup_count}")
+# utm_source parsed from page_url (validated events are not sessionized yet)
+def _utm_source(url):
+    try:
+        return urlparse.parse_qs(urlparse.urlparse(url).query).get("utm_source", [None])[0]
+    except Exception:
+        return None
 
-    # UTM missing rate
-    utm_missing = df[df.utm_source.isna()].shape[0]
-    if utm_missing > 100:
-        alerts.append(f"High UTM missing count: {utm_missing}")
+@derived(["utm_source"], requires=["page_url"])
+def utm_source(df):
+    df["utm_source"] = df["page_url"].map(_utm_source)
 
-    return alerts
+# UTM missing rate
+@rule("monitor.utm_coverage", suite="monitor", requires=["utm_source"])
+def utm_coverage(df, ctx):
+    utm_missing = int(df.utm_source.isna().sum())
+    return utm_missing <= UTM_MISSING_THRESHOLD, f"High UTM missing count: {utm_missing}"
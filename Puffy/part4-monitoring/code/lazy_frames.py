@@ -0,0 +1,78 @@
+"""
+lazy_frames.py
+Lazy, column-projected frame handles for the monitoring task.
+
+A LazyFrame points at a parquet file/dataset instead of holding rows. Monitors
+declare the columns they read; project() loads only those columns, with the
+run date pushed down as a row filter, and caches them on the handle so a
+column loaded for one monitor is reused by the next. Rows whose date is null are
+kept (monitors look for them). Requested columns absent from the file are left
+out, so the rule planner skips and reports the monitors that need them; a file
+with no columns at all (e.g. no purchases that day) loads as an empty frame.
+Plain DataFrames pass through project() unchanged.
+"""
+
+import pandas as pd
+
+
+class LazyFrame:
+    def __init__(self, path, date_column=None, date=None):
+        self.path = path
+        self.date_column = date_column
+        self.date = date
+        self._schema = None
+        self._cache = None
+
+    @property
+    def schema(self):
+        if self._schema is None:
+            import pyarrow.parquet as pq
+            self._schema = pq.read_schema(self.path)
+        return self._schema
+
+    @property
+    def columns(self):
+        return self.schema.names
+
+    def _filters(self):
+        if not (self.date_column and self.date) or self.date_column not in self.columns:
+            return None
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # Bounds typed like the column (unit + tz), the run date taken in the column's tz
+        dtype = self.schema.field(self.date_column).type
+        start = pd.Timestamp(self.date)
+        if pa.types.is_timestamp(dtype) and dtype.tz:
+            start = start.tz_localize(dtype.tz)
+        end = start + pd.Timedelta(days=1)
+        if not pa.types.is_timestamp(dtype):
+            start, end = start.date(), end.date()
+
+        day = pc.field(self.date_column)
+        in_day = (day >= pa.scalar(start, type=dtype)) & (day < pa.scalar(end, type=dtype))
+        return in_day | day.is_null()
+
+    def load(self, columns):
+        if not self.columns:
+            return pd.DataFrame(columns=columns)
+
+        present = [c for c in columns if c in self.columns]
+        cached = [] if self._cache is None else list(self._cache.columns)
+        missing = [c for c in present if c not in cached]
+
+        if missing:
+            # Same file + same filters → same rows in the same order, so columns line up
+            loaded = pd.read_parquet(self.path, columns=missing, filters=self._filters())
+            self._cache = loaded if self._cache is None else pd.concat([self._cache, loaded], axis=1)
+
+        if self._cache is None:
+            return pd.DataFrame()
+        return self._cache[present]
+
+
+def project(frame, columns):
+    """Columns a monitor needs, from a LazyFrame or an in-memory DataFrame."""
+    if isinstance(frame, LazyFrame):
+        return frame.load(columns)
+    return frame
@@ -8,14 +8,64 @@ Combines all monitoring checks:
 - Attribution checks
 - Sends alerts via email/slack
 
+Data quality, KPI and attribution monitors are rules of the "monitor" suite
+(see rule_registry): one plan projects the inputs they declare, skips (and
+reports) monitors whose columns are absent, and logs each monitor's cost.
+Frames may be DataFrames or lazy_frames.LazyFrame handles; only the declared
+columns are loaded.
+
 Returns alert messages for Airflow logs.
 """
 
+import logging
+
+import pandas as pd
+
+from rule_registry import compile_plan, run_plan, required_columns, frame_columns
+
 from .pipeline_checks import run_pipeline_operational_checks
-from .data_quality_checks import run_data_quality_monitors
-from .business_kpi_monitors import run_business_kpi_monitors
+# Importing the monitor modules registers their rules
+from . import data_quality_checks, business_kpi_monitors, attribution_monitors
+from .lazy_frames import project
 from .email_alerts import send_email_alert
 
+logger = logging.getLogger(__name__)
+
+# Alert label per monitor rule-name prefix
+MONITOR_LABELS = {
+    "monitor": "DATA QUALITY",
+    "kpi": "BUSINESS KPI",
+    "attribution": "ATTRIBUTION",
+}
+
+
+def run_monitors(events, attribution, ctx):
+    """Plan and run every "monitor" rule; returns (label, message) alerts."""
+    events = project(events, required_columns("monitor"))
+    attribution = (
+        pd.DataFrame() if attribution is None
+        else project(attribution, required_columns("monitor", frame="attribution"))
+    )
+
+    plan = compile_plan(
+        list(events.columns) + frame_columns("attribution", attribution.columns), suite="monitor"
+    )
+    results, _ = run_plan(plan, events, {**ctx, "attribution": attribution})
+
+    alerts = []
+    for r in results:
+        logger.info("monitor cost %s: %s in %.3fs %s", r["check"], r["status"], r["seconds"], r["detail"])
+        label = MONITOR_LABELS.get(r["check"].split(".")[0])
+        if label is None:
+            continue  # derived columns
+        if r["status"] == "FAIL":
+            alerts.append((label, r["detail"]))
+        elif r["status"] == "SKIPPED":
+            # A skipped monitor is reported too, so a monitor never goes quiet unnoticed
+            alerts.append((label, f"Monitor {r['check']} skipped ({r['detail']})."))
+    return alerts
+
+
 def run_monitoring(raw_events_df, funnel_df, attribution_df, env):
     alerts = []
 
@@ -28,21 +78,17 @@ def run_monitoring(raw_events_df, funnel_df, attribution_df, env):
             alerts.append(f"[OPERATIONAL] {res['message']}")
 
     # -----------------------------
-    # 2. Data Quality Checks
-    # -----------------------------
-    dq_results = run_data_quality_monitors(raw_events_df)
-    for a in dq_results:
-        alerts.append(f"[DATA QUALITY] {a}")
-
-    # -----------------------------
-    # 3. Business KPI Checks
+    # 2. Data Quality, Business KPI & Attribution Checks
     # -----------------------------
-    biz_results = run_business_kpi_monitors(funnel_df, attribution_df)
-    for a in biz_results:
-        alerts.append(f"[BUSINESS KPI] {a}")
+    monitor_results = run_monitors(
+        raw_events_df, attribution_df,
+        {"sketch_dir": env.get("sketch_dir"), "run_date": env.get("run_date")},
+    )
+    for label, a in monitor_results:
+        alerts.append(f"[{label}] {a}")
 
     # -----------------------------
-    # 4. Email Alerts (if needed)
+    # 3. Email Alerts (if needed)
     # -----------------------------
     if alerts:
         send_email_alert(
@@ -1,11 +1,11 @@
 """
 pipeline_checks.py
 Production-grade operational checks for GCS, Dataflow, BigQuery.
+Google Cloud clients are imported inside each check, so importing this
+module (e.g. from the DAG file) stays cheap.
 """
 
 import datetime
-from google.cloud import storage, bigquery, dataflow_v1beta3
-from google.api_core.exceptions import GoogleAPIError
 
 EXPECTED_GCS_PREFIX = "raw_events/"
 EXPECTED_MIN_FILES = 5
@@ -22,6 +22,8 @@ LOCATION = "us-central1"
 # ------------------------------------------------------------
 def check_gcs_arrival(env):
     try:
+        from google.cloud import storage
+
         client = storage.Client()
         blobs = list(client.list_blobs(env["gcs_bucket"], prefix=EXPECTED_GCS_PREFIX))
 
@@ -48,6 +50,8 @@ def check_gcs_arrival(env):
 # ------------------------------------------------------------
 def check_dataflow_job(env):
     try:
+        from google.cloud import dataflow_v1beta3
+
         client = dataflow_v1beta3.JobsV1Beta3Client()
         resp = client.list_jobs(
             project_id=PROJECT_ID,
@@ -75,6 +79,8 @@ def check_dataflow_job(env):
 # ------------------------------------------------------------
 def check_bigquery_load(env):
     try:
+        from google.cloud import bigquery
+
         client = bigquery.Client()
 
         query = f"""
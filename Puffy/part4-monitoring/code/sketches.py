@@ -0,0 +1,231 @@
+"""
+sketches.py
+Fixed-size probabilistic sketches for high-cardinality monitors:
+- HyperLogLog      → distinct counts (client_id, event_id), ~1.04/sqrt(2^p) relative error
+- BloomFilter      → "seen before?" for duplicate event_id detection across days
+- CountMinSketch   → approximate frequencies + top-k (channels)
+
+All sketches consume values in chunks, merge with a sketch built with the same
+parameters (other chunks, other days) and persist to .npz files between runs,
+so memory stays constant regardless of the day's cardinality.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 100_000
+
+
+def hash_values(values):
+    """64-bit hashes of the non-null values (vectorized, stable across dtypes / days)."""
+    s = pd.Series(values)
+    s = s[s.notna()].astype(str)
+    return pd.util.hash_pandas_object(s, index=False).to_numpy(dtype=np.uint64)
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    values = pd.Series(values)
+    for start in range(0, len(values), size):
+        yield values.iloc[start:start + size]
+
+
+def _bit_length(x):
+    # Exact bit length of uint64 values, computed on 32-bit halves so float log2 is exact
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    bl_hi = np.where(hi > 0, np.floor(np.log2(np.maximum(hi, 1))) + 1, 0)
+    bl_lo = np.where(lo > 0, np.floor(np.log2(np.maximum(lo, 1))) + 1, 0)
+    return np.where(hi > 0, 32 + bl_hi, bl_lo).astype(np.int64)
+
+
+def _double_hash(h, n, modulo):
+    # Kirsch–Mitzenmacher: n index functions from one 64-bit hash
+    h1 = h & np.uint64(0xFFFFFFFF)
+    h2 = (h >> np.uint64(32)) | np.uint64(1)
+    i = np.arange(n, dtype=np.uint64)
+    return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(modulo)
+
+
+class _Sketch:
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays, meta = self._state()
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(tmp, meta=json.dumps(meta), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls._from_state({k: f[k] for k in f.files if k != "meta"}, json.loads(str(f["meta"])))
+
+    def _check_compatible(self, other):
+        if type(other) is not type(self) or other._state()[1]["params"] != self._state()[1]["params"]:
+            raise ValueError(f"Cannot merge {type(self).__name__} sketches with different parameters.")
+
+
+# ------------------------------------------------------------
+# HyperLogLog — distinct counts
+# ------------------------------------------------------------
+class HyperLogLog(_Sketch):
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, values):
+        for chunk in _chunks(values):
+            h = hash_values(chunk)
+            idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+            w = h & np.uint64((1 << (64 - self.p)) - 1)
+            rank = (64 - self.p) - _bit_length(w) + 1
+            np.maximum.at(self.registers, idx, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        self._check_compatible(other)
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)  # linear counting for small sets
+        return int(round(estimate))
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def _state(self):
+        return {"registers": self.registers}, {"params": {"p": self.p}}
+
+    @classmethod
+    def _from_state(cls, arrays, meta):
+        sketch = cls(**meta["params"])
+        sketch.registers = arrays["registers"]
+        return sketch
+
+
+# ------------------------------------------------------------
+# Bloom filter — membership / cross-day duplicates
+# ------------------------------------------------------------
+class BloomFilter(_Sketch):
+    def __init__(self, capacity=10_000_000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        n_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.n_bits = (n_bits + 7) // 8 * 8
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = np.zeros(self.n_bits // 8, dtype=np.uint8)
+
+    def _positions(self, h):
+        pos = _double_hash(h, self.n_hashes, self.n_bits)
+        return (pos >> np.uint64(3)).astype(np.int64), (pos & np.uint64(7)).astype(np.uint8)
+
+    def _contains_hashes(self, h):
+        byte, bit = self._positions(h)
+        return ((self.bits[byte] >> bit) & 1).all(axis=1)
+
+    def _add_hashes(self, h):
+        byte, bit = self._positions(h)
+        np.bitwise_or.at(self.bits, byte.ravel(), (np.uint8(1) << bit).ravel())
+
+    def add(self, values):
+        for chunk in _chunks(values):
+            self._add_hashes(hash_values(chunk))
+        return self
+
+    def contains(self, values):
+        return np.concatenate(
+            [self._contains_hashes(hash_values(c)) for c in _chunks(values)] or [np.zeros(0, bool)]
+        )
+
+    def add_new(self, values):
+        """Add values; returns a mask of those (probably) seen before, in this or earlier batches."""
+        seen = []
+        for chunk in _chunks(values):
+            h = hash_values(chunk)
+            dup = self._contains_hashes(h) | pd.Series(h).duplicated().to_numpy()
+            self._add_hashes(h)
+            seen.append(dup)
+        return np.concatenate(seen or [np.zeros(0, bool)])
+
+    def merge(self, other):
+        self._check_compatible(other)
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+        return self
+
+    def _state(self):
+        return {"bits": self.bits}, {"params": {"capacity": self.capacity, "error_rate": self.error_rate}}
+
+    @classmethod
+    def _from_state(cls, arrays, meta):
+        sketch = cls(**meta["params"])
+        sketch.bits = arrays["bits"]
+        return sketch
+
+
+# ------------------------------------------------------------
+# Count-min — frequencies and top-k
+# ------------------------------------------------------------
+class CountMinSketch(_Sketch):
+    def __init__(self, width=2048, depth=5, top_k=20):
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.heavy = {}
+
+    def _update_heavy(self, keys):
+        candidates = set(self.heavy) | set(keys)
+        estimates = dict(zip(candidates, self.estimate(list(candidates))))
+        top = sorted(estimates.items(), key=lambda kv: kv[1], reverse=True)[:self.top_k]
+        self.heavy = {k: int(v) for k, v in top}
+
+    def add(self, values):
+        for chunk in _chunks(values):
+            counts = chunk.dropna().astype(str).value_counts()
+            if counts.empty:
+                continue
+            idx = _double_hash(hash_values(counts.index), self.depth, self.width).astype(np.int64)
+            for row in range(self.depth):
+                np.add.at(self.table[row], idx[:, row], counts.to_numpy())
+            self._update_heavy(counts.index.tolist())
+        return self
+
+    def estimate(self, keys):
+        keys = pd.Series(keys, dtype=object).astype(str)
+        if keys.empty:
+            return np.zeros(0, dtype=np.int64)
+        idx = _double_hash(hash_values(keys), self.depth, self.width).astype(np.int64)
+        return self.table[np.arange(self.depth)[None, :], idx].min(axis=1)
+
+    def top(self, n=None):
+        return sorted(self.heavy.items(), key=lambda kv: kv[1], reverse=True)[:n or self.top_k]
+
+    def total(self):
+        return int(self.table[0].sum())
+
+    def merge(self, other):
+        self._check_compatible(other)
+        self.table += other.table
+        self._update_heavy(list(other.heavy))
+        return self
+
+    def _state(self):
+        params = {"width": self.width, "depth": self.depth, "top_k": self.top_k}
+        return {"table": self.table}, {"params": params, "heavy": list(self.heavy)}
+
+    @classmethod
+    def _from_state(cls, arrays, meta):
+        sketch = cls(**meta["params"])
+        sketch.table = arrays["table"]
+        sketch._update_heavy(meta["heavy"])
+        return sketch